@@ -0,0 +1,23 @@
+"""server.app with the scraper pointed at the stub upstream.
+
+The benchmark serves it as benchmark.benchApp:app under uvicorn or the
+Procfile gunicorn setup without touching the real eCampus site.
+The upstream base URL is read from BENCH_UPSTREAM_URL.
+"""
+import os
+
+from dataFetchFunctions import CAMarksWebScrapper
+from server import app
+
+ECAMPUS_ORIGIN = "https://ecampus.psgtech.ac.in"
+
+
+def point_scraper_at(upstream_url: str):
+    upstream_url = upstream_url.rstrip("/")
+    for name, value in list(vars(CAMarksWebScrapper).items()):
+        if isinstance(value, str) and value.startswith(ECAMPUS_ORIGIN):
+            setattr(CAMarksWebScrapper, name, upstream_url + value[len(ECAMPUS_ORIGIN):])
+
+
+if os.environ.get("BENCH_UPSTREAM_URL"):
+    point_scraper_at(os.environ["BENCH_UPSTREAM_URL"])
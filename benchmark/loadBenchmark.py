@@ -0,0 +1,662 @@
+"""Load and latency benchmark for the /fetch_data endpoint.
+
+Starts server.app in a child process, either under a single uvicorn
+process or under the gunicorn command from the Procfile, points the
+scraper at the local stub upstream (benchmark/stubUpstream.py) and drives
+concurrent /fetch_data requests through three workloads:
+
+    cold_login      every request logs in as a user the server has not seen
+    warm_cache      requests cycle through a small pool of already-seen users
+    mixed_sections  full / no-CA / large profiles plus rejected logins
+
+The result is a JSON report with throughput, success rate (2xx, or 401 for
+the deliberately rejected logins), transport errors, latency percentiles
+for all and for successful responses, and CPU / RSS per server worker
+process; the load generator runs in this process and is never sampled.
+
+Pass an earlier report with --baseline to compare against it. The exit
+code is 1 when throughput or p50 latency regresses by more than
+--max-regression percent, or when the success rate drops or the error
+count rises at all. Each workload runs --repeat times and the medians are
+compared; p95/p99 only fail the gate with --gate-tail-latency. A baseline
+recorded with different settings or workloads is refused with exit code 2
+unless --force-compare is given.
+
+    python -m benchmark.loadBenchmark --mode gunicorn --output current.json
+    python -m benchmark.loadBenchmark --mode gunicorn --baseline current.json
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+WORKLOADS = ["cold_login", "warm_cache", "mixed_sections"]
+MIXED_PROFILES = [("full", 0.5), ("large", 0.2), ("noca", 0.2), ("invalid", 0.1)]
+BENCH_PASSWORD = "bench"
+INVALID_PASSWORD = "wrong"
+PERCENTILES = [50, 95, 99]
+SERVER_OUTPUT_TAIL = 40
+# report meta that must match the baseline for a comparison to mean anything
+COMPARED_SETTINGS = [
+    "mode", "server_command", "cpu_count", "workloads", "concurrency", "requests", "warmup",
+    "repeat", "warm_users", "mixed_users", "seed", "timeout", "upstream_delay_ms",
+]
+# (metric path in a workload report, higher is better, any worsening fails,
+#  tail latency that is only gated with --gate-tail-latency)
+COMPARED_METRICS = [
+    (("success_rate",), True, True, False),
+    (("error_count",), False, True, False),
+    (("throughput_rps",), True, False, False),
+    (("success_rps",), True, False, False),
+    (("success_latency_ms", "p50"), False, False, False),
+    (("success_latency_ms", "p95"), False, False, True),
+    (("success_latency_ms", "p99"), False, False, True),
+]
+# per-run fields reported as the median across --repeat runs
+MEDIAN_FIELDS = ["duration_s", "throughput_rps", "success_rps"]
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values: list, pct: float):
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def build_credentials(workload: str, count: int, args, run_tag: str) -> list:
+    if workload == "cold_login":
+        return [(f"full-{run_tag}c{i}", BENCH_PASSWORD) for i in range(count)]
+
+    if workload == "warm_cache":
+        return [(f"full-warm{i % args.warm_users}", BENCH_PASSWORD) for i in range(count)]
+
+    rng = random.Random(args.seed)
+    profiles, weights = zip(*MIXED_PROFILES)
+    credentials = []
+    for _ in range(count):
+        profile = rng.choices(profiles, weights)[0]
+        user_id = rng.randrange(args.mixed_users)
+        if profile == "invalid":
+            credentials.append((f"full-mixed{user_id}", INVALID_PASSWORD))
+        else:
+            credentials.append((f"{profile}-mixed{user_id}", BENCH_PASSWORD))
+    return credentials
+
+
+def read_process_usage(pid: int):
+    """Return (cpu_seconds, rss_bytes) for pid from /proc, or None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration, IndexError, ValueError):
+        return None
+    # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu_seconds, rss_kb * 1024
+
+
+def child_pids(parent_pid: int) -> list:
+    pids = []
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == parent_pid:
+            pids.append(int(entry.name))
+    return sorted(pids)
+
+
+class ProcessSampler:
+    """Tracks CPU time and peak RSS of the worker processes during a run."""
+
+    def __init__(self, list_pids, interval: float = 0.2):
+        self.list_pids = list_pids
+        self.interval = interval
+        self.start_usage = {}
+        self.peak_rss = collections.defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> dict:
+        usage = {}
+        for pid in self.list_pids():
+            sample = read_process_usage(pid)
+            if sample is not None:
+                usage[pid] = sample
+                self.peak_rss[pid] = max(self.peak_rss[pid], sample[1])
+        return usage
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.start_usage = self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, elapsed: float) -> list:
+        self._stop.set()
+        self._thread.join()
+        end_usage = self._sample()
+        workers = []
+        for pid, (cpu_end, rss_end) in sorted(end_usage.items()):
+            cpu_start = self.start_usage.get(pid, (0.0, 0))[0]
+            cpu_seconds = cpu_end - cpu_start
+            workers.append({
+                "pid": pid,
+                "cpu_seconds": round(cpu_seconds, 3),
+                "cpu_percent": round(cpu_seconds / elapsed * 100, 1) if elapsed else None,
+                "rss_end_bytes": rss_end,
+                "rss_peak_bytes": self.peak_rss[pid],
+                "respawned": pid not in self.start_usage,
+            })
+        return workers
+
+
+@contextlib.contextmanager
+def stub_upstream(delay_ms: float):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmark.stubUpstream", "--port", "0", "--delay-ms", str(delay_ms)],
+        cwd=REPO_ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        url = proc.stdout.readline().strip().rsplit(" ", 1)[-1]
+        if not url.startswith("http://"):
+            raise RuntimeError("stub upstream failed to start")
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def wait_until_online(base_url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode} before coming online")
+        try:
+            if httpx.get(f"{base_url}/online", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not come online within {timeout}s")
+
+
+def uvicorn_command(port: int) -> list:
+    return [
+        sys.executable, "-m", "uvicorn", "benchmark.benchApp:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+
+
+def gunicorn_command(port: int, workers: int = None) -> list:
+    procfile = (REPO_ROOT / "Procfile").read_text().splitlines()
+    web = next(line for line in procfile if line.startswith("web:"))
+    argv = shlex.split(web[len("web:"):])
+    if argv[0] != "gunicorn":
+        raise RuntimeError(f"Procfile web process is not gunicorn: {web}")
+
+    command = [sys.executable, "-m", "gunicorn"]
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in ("-b", "--bind"):
+            next(args)
+            command += [arg, f"127.0.0.1:{port}"]
+        elif arg in ("-w", "--workers") and workers:
+            next(args)
+            command += [arg, str(workers)]
+        elif arg == "--worker-tmp-dir":
+            tmp_dir = next(args)
+            if os.path.isdir(tmp_dir):
+                command += [arg, tmp_dir]
+        elif arg == "app:app":
+            command.append("benchmark.benchApp:app")
+        else:
+            command.append(arg)
+    return command
+
+
+def display_command(command: list, port: int) -> str:
+    """The server command as recorded in the report, without the random port."""
+    tokens = {str(port): "PORT", f"127.0.0.1:{port}": "127.0.0.1:PORT"}
+    return shlex.join(tokens.get(arg, arg) for arg in command[2:])
+
+
+@contextlib.contextmanager
+def server_process(command: list, upstream_url: str, port: int, list_pids, log_path: str = None):
+    """Run the app server as a child process; list_pids(proc) gives the workers to sample.
+
+    Server stdout/stderr (including the DEBUG logging that dataFetchFunctions
+    switches on) go straight to log_path, or to a temporary file that is
+    deleted afterwards, so the load generator never reads server output.
+    The temporary file is only read to explain a server that fails to start.
+    """
+    env = dict(os.environ, BENCH_UPSTREAM_URL=upstream_url)
+    log = open(log_path, "w") if log_path else tempfile.TemporaryFile("w+")
+    proc = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        try:
+            wait_until_online(base_url, proc)
+        except RuntimeError as e:
+            proc.terminate()
+            proc.wait()
+            if log_path:
+                raise RuntimeError(f"{e}; see {log_path}") from None
+            log.seek(0)
+            tail = collections.deque(log, maxlen=SERVER_OUTPUT_TAIL)
+            raise RuntimeError(f"{e}; server output:\n{''.join(tail)}") from None
+        yield base_url, lambda: list_pids(proc)
+    finally:
+        proc.terminate()
+        proc.wait()
+        log.close()
+
+
+def expected_response(password: str, status_code: int) -> bool:
+    if password == INVALID_PASSWORD:
+        return status_code == 401
+    return 200 <= status_code < 300
+
+
+def latency_summary(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    summary = {f"p{pct}": percentile(latencies, pct) for pct in PERCENTILES}
+    summary.update(
+        min=latencies[0] if latencies else None,
+        mean=sum(latencies) / len(latencies) if latencies else None,
+        max=latencies[-1] if latencies else None,
+    )
+    return {key: round(value, 2) if value is not None else None for key, value in summary.items()}
+
+
+async def drive(base_url: str, credentials: list, concurrency: int, timeout: float):
+    """Returns (latency_ms, expected) per response, status counts, transport errors and wall time."""
+    responses = []
+    statuses = collections.Counter()
+    errors = collections.Counter()
+    queue = iter(credentials)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def user():
+            for user_name, password in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/fetch_data", json={"username": user_name, "password": password}
+                    )
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                latency = (time.perf_counter() - started) * 1000
+                responses.append((latency, expected_response(password, response.status_code)))
+                statuses[str(response.status_code)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return responses, statuses, errors, elapsed
+
+
+def run_once(workload: str, base_url: str, list_pids, args, run: int) -> dict:
+    run_tag = f"{os.getpid()}t{int(time.time())}r{run}"
+    credentials = build_credentials(workload, args.warmup + args.requests, args, run_tag)
+    warmup, measured = credentials[:args.warmup], credentials[args.warmup:]
+    if workload == "warm_cache":
+        warmup = build_credentials(workload, args.warm_users, args, run_tag) + warmup
+    if warmup:
+        asyncio.run(drive(base_url, warmup, args.concurrency, args.timeout))
+
+    sampler = ProcessSampler(list_pids)
+    sampler.start()
+    responses, statuses, errors, elapsed = asyncio.run(
+        drive(base_url, measured, args.concurrency, args.timeout)
+    )
+    workers = sampler.stop(elapsed)
+
+    successful = [latency for latency, expected in responses if expected]
+    return {
+        "requests": len(measured),
+        "completed": len(responses),
+        "successful": len(successful),
+        "success_rate": round(len(successful) / len(measured), 4) if measured else None,
+        "error_count": sum(errors.values()),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(responses) / elapsed, 2) if elapsed else None,
+        "success_rps": round(len(successful) / elapsed, 2) if elapsed else None,
+        "latency_ms": latency_summary([latency for latency, _ in responses]),
+        "success_latency_ms": latency_summary(successful),
+        "status_codes": dict(sorted(statuses.items())),
+        "errors": dict(errors),
+        "workers": workers,
+    }
+
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def merge_workers(runs: list) -> list:
+    by_pid = collections.defaultdict(list)
+    for run in runs:
+        for worker in run["workers"]:
+            by_pid[worker["pid"]].append(worker)
+    return [
+        {
+            "pid": pid,
+            "runs": len(samples),
+            "cpu_seconds": median(sample["cpu_seconds"] for sample in samples),
+            "cpu_percent": median(sample["cpu_percent"] for sample in samples),
+            "rss_end_bytes": samples[-1]["rss_end_bytes"],
+            "rss_peak_bytes": max(sample["rss_peak_bytes"] for sample in samples),
+            "respawned": any(sample["respawned"] for sample in samples),
+        }
+        for pid, samples in sorted(by_pid.items())
+    ]
+
+
+def run_workload(workload: str, base_url: str, list_pids, args) -> dict:
+    """Runs the workload --repeat times and summarises the runs.
+
+    Throughput and latency are medians across runs; request, success and
+    error counts are totals, so a single bad run still shows up.
+    """
+    runs = [run_once(workload, base_url, list_pids, args, run) for run in range(args.repeat)]
+    requests = sum(run["requests"] for run in runs)
+    successful = sum(run["successful"] for run in runs)
+    statuses, errors = collections.Counter(), collections.Counter()
+    for run in runs:
+        statuses.update(run["status_codes"])
+        errors.update(run["errors"])
+
+    summary = {
+        "repeat": len(runs),
+        "requests": requests,
+        "completed": sum(run["completed"] for run in runs),
+        "successful": successful,
+        "success_rate": round(successful / requests, 4) if requests else None,
+        "error_count": sum(errors.values()),
+    }
+    summary.update({field: median(run[field] for run in runs) for field in MEDIAN_FIELDS})
+    for field in ["latency_ms", "success_latency_ms"]:
+        summary[field] = {key: median(run[field][key] for run in runs) for key in runs[0][field]}
+    summary.update(
+        status_codes=dict(sorted(statuses.items())),
+        errors=dict(errors),
+        workers=merge_workers(runs),
+        runs=runs,
+    )
+    return summary
+
+
+def metric(workload_report: dict, path: tuple):
+    value = workload_report
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def mismatched_settings(meta: dict, baseline: dict) -> list:
+    return [key for key in COMPARED_SETTINGS if meta.get(key) != baseline.get("meta", {}).get(key)]
+
+
+def missing_workloads(workloads, baseline: dict) -> dict:
+    """Workloads that only one side of a comparison has."""
+    baseline_workloads = baseline.get("workloads", {})
+    return {
+        "not_in_current": [workload for workload in baseline_workloads if workload not in workloads],
+        "not_in_baseline": [workload for workload in workloads if workload not in baseline_workloads],
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float, gate_tail_latency: bool = False) -> dict:
+    comparison = {
+        "baseline_commit": baseline.get("meta", {}).get("git_commit"),
+        "max_regression_pct": max_regression,
+        "gate_tail_latency": gate_tail_latency,
+        "mismatched_settings": mismatched_settings(report["meta"], baseline),
+        "missing_workloads": missing_workloads(report["workloads"], baseline),
+        "workloads": {},
+        "regressions": [],
+    }
+    for workload, current in report["workloads"].items():
+        previous = baseline.get("workloads", {}).get(workload)
+        if previous is None:
+            continue
+        metrics = {}
+        for path, higher_is_better, strict, tail in COMPARED_METRICS:
+            name = ".".join(path)
+            base_value, value = metric(previous, path), metric(current, path)
+            if base_value is None or value is None:
+                continue
+            change_pct = (value - base_value) / base_value * 100 if base_value else None
+            if strict:
+                regressed = value < base_value if higher_is_better else value > base_value
+            elif change_pct is None:
+                continue
+            else:
+                regressed = -change_pct > max_regression if higher_is_better else change_pct > max_regression
+            gated = gate_tail_latency or not tail
+            metrics[name] = {
+                "baseline": base_value,
+                "current": value,
+                "change_pct": round(change_pct, 2) if change_pct is not None else None,
+                "regressed": regressed,
+                "gated": gated,
+            }
+            if regressed and gated:
+                comparison["regressions"].append(f"{workload}.{name}")
+        comparison["workloads"][workload] = metrics
+    return comparison
+
+
+def print_summary(report: dict):
+    out = sys.stderr
+    fmt = lambda value, spec=".1f": f"{value:>10{spec}}" if value is not None else f"{'-':>10}"
+    print(
+        f"\n{'workload':<16}{'ok rps':>10}{'ok %':>10}{'errors':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  status",
+        file=out,
+    )
+    for workload, result in report["workloads"].items():
+        latency = result["success_latency_ms"]
+        success_pct = result["success_rate"] * 100 if result["success_rate"] is not None else None
+        print(
+            f"{workload:<16}{fmt(result['success_rps'])}{fmt(success_pct)}{fmt(result['error_count'], 'd')}"
+            f"{fmt(latency['p50'])}{fmt(latency['p95'])}{fmt(latency['p99'])}  {result['status_codes']}",
+            file=out,
+        )
+
+    comparison = report.get("comparison")
+    if not comparison:
+        return
+    if comparison["mismatched_settings"]:
+        print(
+            f"\nwarning: compared despite settings differing from baseline: "
+            f"{', '.join(comparison['mismatched_settings'])}",
+            file=out,
+        )
+    for side, workloads in comparison["missing_workloads"].items():
+        if workloads:
+            print(f"warning: workloads {side.replace('_', ' ')}: {', '.join(workloads)}", file=out)
+    for workload, metrics in comparison["workloads"].items():
+        for name, values in metrics.items():
+            flag = ""
+            if values["regressed"]:
+                flag = "  REGRESSION" if values["gated"] else "  (worse, not gated)"
+            change = f" ({values['change_pct']:+.1f}%)" if values["change_pct"] is not None else ""
+            print(f"{workload}.{name}: {values['baseline']} -> {values['current']}{change}{flag}", file=out)
+
+
+def bounded_int(minimum: int):
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {number}")
+        return number
+
+    parse.__name__ = "positive int" if minimum == 1 else f"int >= {minimum}"
+    return parse
+
+
+positive_int = bounded_int(1)
+non_negative_int = bounded_int(0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /fetch_data throughput and latency")
+    parser.add_argument("--mode", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--concurrency", type=positive_int, default=8)
+    parser.add_argument("--requests", type=positive_int, default=200, help="measured requests per workload run")
+    parser.add_argument("--repeat", type=positive_int, default=3,
+                        help="runs per workload; throughput and latency are the median across runs")
+    parser.add_argument("--warmup", type=non_negative_int, default=10, help="unmeasured requests before each workload")
+    parser.add_argument("--warm-users", type=positive_int, default=4, help="user pool size for warm_cache")
+    parser.add_argument("--mixed-users", type=positive_int, default=64, help="user pool size per profile for mixed_sections")
+    parser.add_argument("--seed", type=int, default=26)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--upstream-delay-ms", type=float, default=0.0,
+                        help="artificial latency of every stub upstream response")
+    parser.add_argument("--workers", type=positive_int, help="override the Procfile gunicorn worker count")
+    parser.add_argument("--server-log", help="file for server output and logging (a deleted temporary file by default)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--force-compare", action="store_true",
+                        help="compare against a baseline recorded with different settings")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="allowed regression in percent before exiting with status 1")
+    parser.add_argument("--gate-tail-latency", action="store_true",
+                        help="also fail on p95/p99 regressions, which are noisy at small sample sizes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    port = free_port()
+
+    if args.mode == "gunicorn":
+        command = gunicorn_command(port, args.workers)
+        list_pids = lambda proc: child_pids(proc.pid)
+    else:
+        command = uvicorn_command(port)
+        list_pids = lambda proc: [proc.pid]
+
+    meta = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "mode": args.mode,
+        "server_command": display_command(command, port),
+        "workloads": args.workloads,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "warm_users": args.warm_users,
+        "mixed_users": args.mixed_users,
+        "seed": args.seed,
+        "timeout": args.timeout,
+        "upstream_delay_ms": args.upstream_delay_ms,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatched = mismatched_settings(meta, baseline)
+        missing = missing_workloads(args.workloads, baseline)
+        if mismatched and not args.force_compare:
+            print(
+                f"error: {args.baseline} was recorded with different settings "
+                f"({', '.join(mismatched)}); rerun the baseline with the same settings "
+                f"or pass --force-compare",
+                file=sys.stderr,
+            )
+            return 2
+        if any(missing.values()) and not args.force_compare:
+            print(
+                f"error: {args.baseline} does not cover the same workloads "
+                f"(not in current: {', '.join(missing['not_in_current']) or '-'}; "
+                f"not in baseline: {', '.join(missing['not_in_baseline']) or '-'}); "
+                f"pass --force-compare to compare the shared ones",
+                file=sys.stderr,
+            )
+            return 2
+
+    with contextlib.ExitStack() as stack:
+        upstream_url = stack.enter_context(stub_upstream(args.upstream_delay_ms))
+        base_url, list_pids = stack.enter_context(
+            server_process(command, upstream_url, port, list_pids, args.server_log)
+        )
+
+        workloads = {}
+        for workload in args.workloads:
+            print(f"running {workload} ...", file=sys.stderr, flush=True)
+            workloads[workload] = run_workload(workload, base_url, list_pids, args)
+
+    report = {"meta": meta, "workloads": workloads}
+    if baseline is not None:
+        report["comparison"] = compare(report, baseline, args.max_regression, args.gate_tail_latency)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    print_summary(report)
+
+    return 1 if report.get("comparison", {}).get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Local stand-in for the PSG eCampus site used by the load benchmark.
+
+Serves just enough of the studzone2 pages for CAMarksWebScrapper to log in
+and parse every section that /fetch_data asks for. The username picks the
+data profile that is served back:
+
+    full-<id>   six courses, both CA mark tables
+    noca-<id>   six courses, CA marks not yet published
+    large-<id>  thirty courses, both CA mark tables
+
+Any password equal to "wrong" is rejected with the eCampus "Invalid" page.
+
+Run it on its own with:
+
+    python -m benchmark.stubUpstream --port 8900
+"""
+import argparse
+import time
+from functools import lru_cache
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+STUDZONE_PATH = "/studzone2/"
+SESSION_COOKIE = "ASP.NET_SessionId"
+INVALID_PASSWORD = "wrong"
+
+PROFILE_COURSES = {
+    "full": 6,
+    "noca": 6,
+    "large": 30,
+}
+GRADES = ["O", "A+", "A", "B+", "B", "C+", "C"]
+
+
+def profile_for(user_name: str) -> str:
+    profile = user_name.split("-", 1)[0]
+    return profile if profile in PROFILE_COURSES else "full"
+
+
+def table(attrs: str, rows: list) -> str:
+    body = "".join(
+        "<tr>" + "".join(f"<td>{col}</td>" for col in row) + "</tr>" for row in rows
+    )
+    return f"<table {attrs}>{body}</table>"
+
+
+def page(body: str) -> str:
+    return f"<html><body><form>{body}</form></body></html>"
+
+
+def login_page() -> str:
+    return page(
+        '<input type="hidden" id="__VIEWSTATE" value="stub-viewstate" />'
+        '<input type="hidden" id="__VIEWSTATEGENERATOR" value="stub-generator" />'
+        '<input type="hidden" id="__EVENTVALIDATION" value="stub-validation" />'
+        '<input type="text" id="txtusercheck" />'
+        '<input type="password" id="txtpwdcheck" />'
+    )
+
+
+def profile_page(user_name: str) -> str:
+    academic = table(
+        'id="ItStud"',
+        [
+            ["RollNo", ":", user_name.upper(), "Name", ":", "BENCH STUDENT"],
+            ["Batch", ":", "2022 - 2026", "Programme", ":", "BE CSE"],
+            ["Resident-Status", ":", "DAY SCHOLAR", "Section", ":", "A"],
+        ],
+    )
+    address = table(
+        'id="DlsAddr"',
+        [
+            ["BENCH PARENT"],
+            ["1, Avinashi Road"],
+            ["Peelamedu"],
+            ["Coimbatore"],
+            ["641004"],
+            ["Mobile:9000000000"],
+            ["Mail :parent@example.com"],
+            ["Student Mobile:9000000001"],
+            ["Student EMail :student@example.com"],
+        ],
+    )
+    return page(academic + address)
+
+
+@lru_cache(maxsize=None)
+def attendance_page(profile: str) -> str:
+    rows = [["Course", "Total", "Exempt", "Absent", "Present", "%", "%E", "%EM", "From", "To"]]
+    for i in range(PROFILE_COURSES[profile]):
+        total = 40 + i
+        absent = i % 9
+        present = total - absent
+        percentage = present * 100 // total
+        rows.append(
+            [f"22Z{i:03d}", total, 0, absent, present, percentage, percentage,
+             percentage, "01-07-2024", "30-09-2024"]
+        )
+    return page(table('class="cssbody"', rows))
+
+
+@lru_cache(maxsize=None)
+def sem_results_page(profile: str) -> str:
+    rows = [["Course Code", "Course Title", "Grade", "Result"]]
+    for i in range(PROFILE_COURSES[profile]):
+        rows.append([f"22Z{i:03d}", f"Course {i}", GRADES[i % len(GRADES)], "PASS"])
+    return page(table('id="DgResult"', rows))
+
+
+@lru_cache(maxsize=None)
+def course_details_page(profile: str) -> str:
+    rows = [["S.No", "Code", "Title", "Programme", "Sem", "Month", "Grade", "Credits"]]
+    for i in range(PROFILE_COURSES[profile]):
+        rows.append(
+            [i + 1, f"22Z{i:03d}", f"Course {i}", "BE CSE", 5, "NOV 2024",
+             GRADES[i % len(GRADES)], 3 + i % 2]
+        )
+    return page(table('id="PDGCourse"', rows))
+
+
+@lru_cache(maxsize=None)
+def ca_marks_page(profile: str) -> str:
+    if profile == "noca":
+        return page("<span>CA Marks not yet published</span>")
+    header = [
+        ["Course", "Title", "CA1", "CA2", "CA3", "Best", "AT1", "AT2", "AP", "Total"],
+        ["Code", "Name", "50", "50", "50", "50", "10", "10", "10", "60"],
+    ]
+    rows = [
+        [f"22Z{i:03d}", f"Course {i}", 30 + i % 20, 35, "*", 35, 8, 9, 7, 50]
+        for i in range(PROFILE_COURSES[profile])
+    ]
+    return page(table('id="8^1580"', header + rows) + table('id="8^1590"', header + rows))
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_page(self, body: str, status: int = 200, headers: dict = None):
+        if self.delay:
+            time.sleep(self.delay)
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def session_user(self) -> str:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        return morsel.value if morsel else ""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == STUDZONE_PATH:
+            return self.send_page(login_page())
+
+        user_name = self.session_user()
+        if not user_name:
+            return self.send_page(login_page())
+
+        profile = profile_for(user_name)
+        pages = {
+            "AttWfStudProfile.aspx": lambda: profile_page(user_name),
+            "AttWfPercView.aspx": lambda: attendance_page(profile),
+            "FrmEpsStudResult.aspx": lambda: sem_results_page(profile),
+            "AttWfStudCourseSelection.aspx": lambda: course_details_page(profile),
+            "CAMarks_View.aspx": lambda: ca_marks_page(profile),
+        }
+        render = pages.get(path[len(STUDZONE_PATH):])
+        if render is None:
+            return self.send_page(page("<span>Not found</span>"), status=404)
+        return self.send_page(render())
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        user_name = form.get("txtusercheck", [""])[0]
+        password = form.get("txtpwdcheck", [""])[0]
+
+        if not user_name or password == INVALID_PASSWORD:
+            return self.send_page(page("<span>Invalid Username or Password</span>"))
+
+        return self.send_page(
+            page("<span>Welcome</span>"),
+            headers={"Set-Cookie": f"{SESSION_COOKIE}={user_name}; Path=/"},
+        )
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, delay_ms: float = 0.0) -> ThreadingHTTPServer:
+    handler = type("Handler", (StubUpstreamHandler,), {"delay": delay_ms / 1000.0})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub PSG eCampus upstream for benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--delay-ms", type=float, default=0.0,
+                        help="artificial latency added to every upstream response")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.delay_ms)
+    print(f"stub upstream listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
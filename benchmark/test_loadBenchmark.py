@@ -0,0 +1,181 @@
+import io
+import os
+import sys
+
+import pytest
+
+from benchmark import loadBenchmark
+from benchmark.loadBenchmark import (
+    compare,
+    display_command,
+    gunicorn_command,
+    mismatched_settings,
+    missing_workloads,
+    percentile,
+    read_process_usage,
+)
+
+
+def workload_report(success_rate=1.0, error_count=0, rps=40.0, p50=100.0, p95=150.0, p99=200.0):
+    return {
+        "success_rate": success_rate,
+        "error_count": error_count,
+        "throughput_rps": rps,
+        "success_rps": rps * success_rate,
+        "success_latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+    }
+
+
+def report(meta=None, **workloads):
+    return {"meta": meta or {}, "workloads": workloads}
+
+
+def test_percentile_empty():
+    assert percentile([], 50) is None
+
+
+def test_percentile_single_value():
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 100) == 4.0
+
+
+def test_compare_identical_reports_pass():
+    current = report(cold_login=workload_report())
+    comparison = compare(current, report(cold_login=workload_report()), max_regression=10)
+    assert comparison["regressions"] == []
+    assert comparison["mismatched_settings"] == []
+
+
+def test_compare_any_success_rate_drop_regresses():
+    current = report(cold_login=workload_report(success_rate=0.99))
+    comparison = compare(current, report(cold_login=workload_report()), max_regression=10)
+    assert "cold_login.success_rate" in comparison["regressions"]
+
+
+def test_compare_error_count_from_zero_regresses():
+    current = report(cold_login=workload_report(error_count=1))
+    comparison = compare(current, report(cold_login=workload_report()), max_regression=10)
+    errors = comparison["workloads"]["cold_login"]["error_count"]
+    assert errors["change_pct"] is None
+    assert errors["regressed"]
+    assert "cold_login.error_count" in comparison["regressions"]
+
+
+def test_compare_percentage_metrics_use_threshold():
+    within = compare(report(w=workload_report(rps=37.0, p50=109.0)), report(w=workload_report()), 10)
+    assert within["regressions"] == []
+
+    beyond = compare(report(w=workload_report(rps=35.0, p50=111.0)), report(w=workload_report()), 10)
+    assert set(beyond["regressions"]) == {"w.throughput_rps", "w.success_rps", "w.success_latency_ms.p50"}
+
+
+def test_compare_tail_latency_only_gated_on_request():
+    current = report(w=workload_report(p95=300.0, p99=400.0))
+    baseline = report(w=workload_report())
+
+    default = compare(current, baseline, max_regression=10)
+    assert default["regressions"] == []
+    assert default["workloads"]["w"]["success_latency_ms.p95"]["regressed"]
+    assert not default["workloads"]["w"]["success_latency_ms.p95"]["gated"]
+
+    gated = compare(current, baseline, max_regression=10, gate_tail_latency=True)
+    assert set(gated["regressions"]) == {"w.success_latency_ms.p95", "w.success_latency_ms.p99"}
+
+
+def test_compare_skips_percentage_metric_with_zero_baseline():
+    current = report(w=workload_report(rps=10.0))
+    comparison = compare(current, report(w=workload_report(rps=0.0)), max_regression=10)
+    assert "throughput_rps" not in comparison["workloads"]["w"]
+    assert comparison["regressions"] == []
+
+
+def test_compare_records_missing_workloads():
+    current = report(cold_login=workload_report())
+    baseline = report(cold_login=workload_report(), mixed_sections=workload_report())
+    comparison = compare(current, baseline, max_regression=10)
+    assert comparison["missing_workloads"] == {"not_in_current": ["mixed_sections"], "not_in_baseline": []}
+    assert list(comparison["workloads"]) == ["cold_login"]
+
+
+def test_missing_workloads():
+    baseline = report(cold_login={}, warm_cache={})
+    assert missing_workloads(["cold_login", "warm_cache"], baseline) == {"not_in_current": [], "not_in_baseline": []}
+    assert missing_workloads(["cold_login", "mixed_sections"], baseline) == {
+        "not_in_current": ["warm_cache"],
+        "not_in_baseline": ["mixed_sections"],
+    }
+
+
+def test_mismatched_settings():
+    meta = {"mode": "uvicorn", "seed": 26, "workloads": ["cold_login"], "created_at": "now"}
+    assert mismatched_settings(meta, report(dict(meta, created_at="earlier"))) == []
+    assert mismatched_settings(meta, report(dict(meta, seed=7))) == ["seed"]
+    assert "mode" in mismatched_settings(meta, {})
+
+
+def write_procfile(tmp_path, monkeypatch, line):
+    (tmp_path / "Procfile").write_text(line + "\n")
+    monkeypatch.setattr(loadBenchmark, "REPO_ROOT", tmp_path)
+
+
+def test_gunicorn_command_rewrites_procfile(tmp_path, monkeypatch):
+    write_procfile(
+        tmp_path, monkeypatch,
+        "web: gunicorn -w 2 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8080 "
+        f"--worker-tmp-dir {tmp_path} app:app",
+    )
+    command = gunicorn_command(41234)
+    assert command[:3] == [sys.executable, "-m", "gunicorn"]
+    assert command[3:] == [
+        "-w", "2", "-k", "uvicorn.workers.UvicornWorker", "--bind", "127.0.0.1:41234",
+        "--worker-tmp-dir", str(tmp_path), "benchmark.benchApp:app",
+    ]
+    assert "-w 4" in " ".join(gunicorn_command(41234, workers=4))
+
+
+def test_gunicorn_command_drops_missing_tmp_dir(tmp_path, monkeypatch):
+    write_procfile(tmp_path, monkeypatch, f"web: gunicorn --worker-tmp-dir {tmp_path / 'nope'} app:app")
+    assert gunicorn_command(41234)[3:] == ["benchmark.benchApp:app"]
+
+
+def test_gunicorn_command_requires_gunicorn(tmp_path, monkeypatch):
+    write_procfile(tmp_path, monkeypatch, "web: uvicorn app:app")
+    with pytest.raises(RuntimeError):
+        gunicorn_command(41234)
+
+
+def test_display_command_hides_port(tmp_path, monkeypatch):
+    write_procfile(tmp_path, monkeypatch, "web: gunicorn -w 2 --bind 0.0.0.0:8080 app:app")
+    assert display_command(gunicorn_command(41234), 41234) == (
+        "gunicorn -w 2 --bind 127.0.0.1:PORT benchmark.benchApp:app"
+    )
+
+
+def test_read_process_usage_field_offsets(monkeypatch):
+    # the command name may contain spaces and parentheses; utime=300, stime=200
+    # and the children's cutime/cstime=7 must not be counted
+    files = {
+        "/proc/42/stat": "42 (odd) name) S 1 1 1 0 -1 0 0 0 0 0 300 200 7 7 20 0 1 0\n",
+        "/proc/42/status": "Name:\todd\nVmPeak:\t  9000 kB\nVmRSS:\t  2048 kB\n",
+    }
+    monkeypatch.setattr(loadBenchmark, "open", lambda path: io.StringIO(files[path]), raising=False)
+    monkeypatch.setattr(loadBenchmark.os, "sysconf", lambda name: 100)
+    assert read_process_usage(42) == (5.0, 2048 * 1024)
+
+
+def test_read_process_usage_missing_process():
+    assert read_process_usage(-1) is None
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="needs /proc")
+def test_read_process_usage_own_process():
+    cpu_seconds, rss_bytes = read_process_usage(os.getpid())
+    times = os.times()
+    assert 0 <= cpu_seconds <= times.user + times.system + 0.1
+    assert rss_bytes > 0